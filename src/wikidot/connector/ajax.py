@@ -208,7 +208,9 @@ class AjaxModuleConnectorClient:
             site_ssl_supported if site_ssl_supported is not None else self.ssl_supported
         )
 
-        async def _request(_body: dict[str, Any]) -> httpx.Response:
+        async def _request(
+            client: httpx.AsyncClient, _body: dict[str, Any]
+        ) -> httpx.Response:
             retry_count = 0
 
             while True:
@@ -218,20 +220,19 @@ class AjaxModuleConnectorClient:
                     response = None
                     # Semaphoreで同時実行数制御
                     async with semaphore_instance:
-                        async with httpx.AsyncClient() as client:
-                            url = (
-                                f'http{"s" if site_ssl_supported else ""}://{site_name}.wikidot.com/'
-                                f"ajax-module-connector.php"
-                            )
-                            _body["wikidot_token7"] = 123456
-                            wd_logger.debug(f"Ajax Request: {url} -> {_body}")
-                            response = await client.post(
-                                url,
-                                headers=self.header.get_header(),
-                                data=_body,
-                                timeout=self.config.request_timeout,
-                            )
-                            response.raise_for_status()
+                        url = (
+                            f'http{"s" if site_ssl_supported else ""}://{site_name}.wikidot.com/'
+                            f"ajax-module-connector.php"
+                        )
+                        _body["wikidot_token7"] = 123456
+                        wd_logger.debug(f"Ajax Request: {url} -> {_body}")
+                        response = await client.post(
+                            url,
+                            headers=self.header.get_header(),
+                            data=_body,
+                            timeout=self.config.request_timeout,
+                        )
+                        response.raise_for_status()
                 except (httpx.HTTPStatusError, httpx.TimeoutException) as e:
                     # HTTPステータスエラーまたはタイムアウトの場合はリトライ
                     retry_count += 1
@@ -306,10 +307,19 @@ class AjaxModuleConnectorClient:
                 return response
 
         async def _execute_requests():
-            return await asyncio.gather(
-                *[_request(body) for body in bodies],
-                return_exceptions=return_exceptions,
-            )
+            # 1回の呼び出し内のリクエストは同じクライアントを共有し、
+            # HTTP/2の多重化とコネクションの再利用を効かせる
+            async with httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=self.config.semaphore_limit,
+                    max_keepalive_connections=self.config.semaphore_limit,
+                ),
+            ) as client:
+                return await asyncio.gather(
+                    *[_request(client, body) for body in bodies],
+                    return_exceptions=return_exceptions,
+                )
 
         # 処理を実行
         return asyncio.run(_execute_requests())
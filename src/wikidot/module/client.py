@@ -1,3 +1,5 @@
+import httpx
+
 from ..common import wd_logger
 from ..common.exceptions import LoginRequiredException
 from ..connector.ajax import AjaxModuleConnectorClient, AjaxModuleConnectorConfig
@@ -144,6 +146,21 @@ class ClientSiteMethods:
         """
         return Site.from_unix_name(self.client, unix_name)
 
+    def exists(self, unix_name: str) -> bool:
+        """UNIX名のサイトが存在するかどうかを調べる
+
+        Parameters
+        ----------
+        unix_name: str
+            サイトのUNIX名
+
+        Returns
+        -------
+        bool
+            サイトが存在すればTrue
+        """
+        return Site.exists(self.client, unix_name)
+
 
 class Client:
     """基幹クライアント"""
@@ -174,6 +191,9 @@ class Client:
         # AMCClientを初期化
         self.amc_client = AjaxModuleConnectorClient(site_name=None, config=amc_config)
 
+        # AMC以外の同期リクエストで使い回すHTTPクライアント
+        self.http_client = httpx.Client(http2=True)
+
         # セッション関連変数の初期化
         self.is_logged_in = False
         self.username = None
@@ -202,6 +222,7 @@ class Client:
             HTTPAuthentication.logout(self)
             self.is_logged_in = False
             self.username = None
+        self.http_client.close()
         del self
 
     def __enter__(self):
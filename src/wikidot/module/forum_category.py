@@ -11,6 +11,9 @@ from .forum_thread import ForumThreadCollection
 if TYPE_CHECKING:
     from .site import Site
 
+# カテゴリのURLからカテゴリIDを取り出すための正規表現
+_CATEGORY_ID_RE = re.compile(r"c-(\d+)")
+
 
 class ForumCategoryCollection(list["ForumCategory"]):
     def __init__(
@@ -55,7 +58,7 @@ class ForumCategoryCollection(list["ForumCategory"]):
             post_count_elem = row.select_one("td.posts")
             if post_count_elem is None:
                 raise NoElementException("Post count element is not found.")
-            category_id_match = re.search(r"c-(\d+)", str(name_link_href))
+            category_id_match = _CATEGORY_ID_RE.search(str(name_link_href))
             if category_id_match is None:
                 raise NoElementException("Category ID is not found.")
             category_id_str = category_id_match.group(1)
@@ -15,6 +15,9 @@ if TYPE_CHECKING:
     from .site import Site
     from .user import AbstractUser
 
+# スレッドのURLからスレッドIDを取り出すための正規表現
+_THREAD_ID_RE = re.compile(r"t-(\d+)")
+
 
 class ForumThreadCollection(list["ForumThread"]):
     def __init__(
@@ -46,7 +49,7 @@ class ForumThreadCollection(list["ForumThread"]):
             if title_href is None:
                 raise NoElementException("Title href is not found.")
 
-            thread_id_match = re.search(r"t-(\d+)", str(title_href))
+            thread_id_match = _THREAD_ID_RE.search(str(title_href))
             if thread_id_match is None:
                 raise NoElementException("Thread ID is not found.")
 
@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Any, Optional, Union
 
 import httpx
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 from ..common import exceptions
@@ -19,6 +20,18 @@ if TYPE_CHECKING:
     from .site import Site
     from .user import User
 
+# _acquire_page_idsでページIDを取り出すための正規表現
+_PAGE_ID_RE = re.compile(r"WIKIREQUEST\.info\.pageId = (\d+);")
+
+# PageCollection._parseでページ要素ごとに使うCSSセレクタ (コンパイル済み)
+_SEL_PAGE = sv.compile("div.page")
+_SEL_5STAR_RATING = sv.compile("span.rating span.page-rate-list-pages-start")
+_SEL_SET = sv.compile("span.set")
+_SEL_NAME = sv.compile("span.name")
+_SEL_VALUE = sv.compile("span.value")
+_SEL_ODATE = sv.compile("span.odate")
+_SEL_PRINTUSER = sv.compile("span.printuser")
+
 DEFAULT_MODULE_BODY = [
     "fullname",  # ページのフルネーム(str)
     "category",  # カテゴリ(str)
@@ -96,28 +109,25 @@ class PageCollection(list["Page"]):
     def _parse(site: "Site", html_body: BeautifulSoup):
         pages = []
 
-        for page_element in html_body.select("div.page"):
+        for page_element in _SEL_PAGE.select(html_body):
             page_params = {}
 
             # レーティング方式を判定
-            is_5star_rating = (
-                page_element.select_one("span.rating span.page-rate-list-pages-start")
-                is not None
-            )
+            is_5star_rating = _SEL_5STAR_RATING.select_one(page_element) is not None
 
             # 各値を取得
-            for set_element in page_element.select("span.set"):
-                key_element = set_element.select_one("span.name")
+            for set_element in _SEL_SET.select(page_element):
+                key_element = _SEL_NAME.select_one(set_element)
                 if key_element is None:
                     raise exceptions.NoElementException("Cannot find key element")
                 key = key_element.text.strip()
-                value_element = set_element.select_one("span.value")
+                value_element = _SEL_VALUE.select_one(set_element)
 
                 if value_element is None:
                     value: Any = None
 
                 elif key in ["created_at", "updated_at", "commented_at"]:
-                    odate_element = value_element.select_one("span.odate")
+                    odate_element = _SEL_ODATE.select_one(value_element)
                     if odate_element is None:
                         value = None
                     else:
@@ -128,7 +138,7 @@ class PageCollection(list["Page"]):
                     "updated_by_linked",
                     "commented_by_linked",
                 ]:
-                    printuser_element = value_element.select_one("span.printuser")
+                    printuser_element = _SEL_PRINTUSER.select_one(value_element)
                     if printuser_element is None:
                         value = None
                     else:
@@ -179,8 +189,8 @@ class PageCollection(list["Page"]):
         return PageCollection(site, pages)
 
     @staticmethod
-    def search_pages(site: "Site", query: SearchPagesQuery = SearchPagesQuery()):
-        # 初回実行
+    def _build_query_dict(query: SearchPagesQuery) -> dict[str, Any]:
+        """検索クエリからListPagesModuleへのリクエストボディを構築する"""
         query_dict = query.as_dict()
         query_dict["moduleName"] = "list/ListPagesModule"
         query_dict["module_body"] = (
@@ -196,9 +206,13 @@ class PageCollection(list["Page"]):
             )
             + "\n[[/div]]"
         )
+        return query_dict
 
+    @staticmethod
+    def _list_pages_request(site: "Site", bodies: list[dict[str, Any]]):
+        """ListPagesModuleへのリクエストを実行する"""
         try:
-            response = site.amc_request([query_dict])[0]
+            return site.amc_request(bodies)
         except exceptions.WikidotStatusCodeException as e:
             if e.status_code == "not_ok":
                 raise exceptions.ForbiddenException(
@@ -206,6 +220,13 @@ class PageCollection(list["Page"]):
                 ) from e
             raise e
 
+    @staticmethod
+    def search_pages(site: "Site", query: SearchPagesQuery = SearchPagesQuery()):
+        # 初回実行
+        query_dict = PageCollection._build_query_dict(query)
+
+        response = PageCollection._list_pages_request(site, [query_dict])[0]
+
         body = response.json()["body"]
 
         first_page_html_body = BeautifulSoup(body, "lxml")
@@ -213,12 +234,10 @@ class PageCollection(list["Page"]):
         total = 1
         html_bodies = [first_page_html_body]
         # pagerが存在する
-        if first_page_html_body.select_one("div.pager") is not None:
-            # span.target[-2] > a から最大ページ数を取得
-            last_pager_element = first_page_html_body.select("div.pager span.target")[
-                -2
-            ]
-            last_pager_link_element = last_pager_element.select_one("a")
+        # span.target[-2] > a から最大ページ数を取得
+        pager_targets = first_page_html_body.select("div.pager span.target")
+        if len(pager_targets) >= 2:
+            last_pager_link_element = pager_targets[-2].select_one("a")
             if last_pager_link_element is None:
                 raise exceptions.NoElementException("Cannot find last pager link")
             total = int(last_pager_link_element.text.strip())
@@ -244,6 +263,45 @@ class PageCollection(list["Page"]):
 
         return PageCollection(site, pages)
 
+    @staticmethod
+    def _acquire_pages_by_fullnames(
+        site: "Site", fullnames: list[str]
+    ) -> list[Optional["Page"]]:
+        """フルネームのリストからページを1回のAMCリクエストでまとめて取得する
+
+        Parameters
+        ----------
+        site: Site
+            サイト
+        fullnames: list[str]
+            ページのフルネームのリスト
+
+        Returns
+        -------
+        list[Page | None]
+            ページのリスト（順序はfullnamesと同じ） 見つからなかったページはNone
+        """
+        if len(fullnames) == 0:
+            return []
+
+        responses = PageCollection._list_pages_request(
+            site,
+            [
+                PageCollection._build_query_dict(
+                    SearchPagesQuery(fullname=fullname, limit=1, perPage=1)
+                )
+                for fullname in fullnames
+            ],
+        )
+
+        pages: list[Optional["Page"]] = []
+        for response in responses:
+            html_body = BeautifulSoup(response.json()["body"], "lxml")
+            res = PageCollection._parse(site, html_body)
+            pages.append(res[0] if len(res) > 0 else None)
+
+        return pages
+
     @staticmethod
     def _acquire_page_ids(site: "Site", pages: list["Page"]):
         # pagesからidが設定されていないものを抽出
@@ -271,7 +329,7 @@ class PageCollection(list["Page"]):
                 )
             source = response.text
 
-            id_match = re.search(r"WIKIREQUEST\.info\.pageId = (\d+);", source)
+            id_match = _PAGE_ID_RE.search(source)
             if id_match is None:
                 raise exceptions.UnexpectedException(
                     f"Cannot find page id: {target_pages[index].fullname}"
@@ -702,12 +760,15 @@ class Page:
         }
         response = site.amc_request([edit_request_body])[0]
 
-        if response.json()["status"] != "ok":
+        status = response.json()["status"]
+        if status != "ok":
             raise exceptions.WikidotStatusCodeException(
-                f"Failed to create or edit page: {fullname}", response.json()["status"]
+                f"Failed to create or edit page: {fullname}", status
             )
 
-        res = PageCollection.search_pages(site, SearchPagesQuery(fullname=fullname))
+        res = PageCollection.search_pages(
+            site, SearchPagesQuery(fullname=fullname, limit=1, perPage=1)
+        )
         if len(res) == 0:
             raise exceptions.NotFoundException(f"Page creation failed: {fullname}")
 
@@ -1,10 +1,10 @@
-from collections.abc import Iterator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, NamedTuple, Optional, cast
 
 import httpx
-from bs4 import BeautifulSoup, ResultSet, Tag
+from bs4 import BeautifulSoup, Tag
+from lxml import html as lxml_html
 
 from ..common import exceptions
 from ..common.decorators import login_required
@@ -17,16 +17,41 @@ if TYPE_CHECKING:
 
 
 class PrivateMessageCollection(list["PrivateMessage"]):
+    """プライベートメッセージのリスト"""
+
+    # id -> PrivateMessage の索引 (findの呼び出し時に構築)
+    _by_id: dict[int, "PrivateMessage"] | None = None
+    # 索引を構築したときの要素数
+    _indexed_len: int = 0
+
     def __str__(self):
         return f"{self.__class__.__name__}({len(self)} messages)"
 
-    def __iter__(self) -> Iterator["PrivateMessage"]:
-        return super().__iter__()
+    def find(self, id: int) -> "PrivateMessage | None":
+        """メッセージIDからメッセージを検索する
+
+        索引は初回呼び出し時に構築し、要素数が変わっていれば再構築する
+        (要素数を変えずに要素を置き換えた場合は反映されない)
+
+        Parameters
+        ----------
+        id: int
+            メッセージID
+
+        Returns
+        -------
+        PrivateMessage | None
+            メッセージ 存在しない場合はNone
+        """
+        if self._by_id is None or self._indexed_len != len(self):
+            self._by_id = {message.id: message for message in self}
+            self._indexed_len = len(self)
+        return self._by_id.get(id)
 
     @staticmethod
     @login_required
     def from_ids(
-        client: "Client", message_ids: list[int]
+        client: "Client", message_ids: list[int], eager: bool = False
     ) -> "PrivateMessageCollection":
         """メッセージIDのリストからメッセージオブジェクトのリストを取得する
 
@@ -36,21 +61,43 @@ class PrivateMessageCollection(list["PrivateMessage"]):
             クライアント
         message_ids: list[int]
             メッセージIDのリスト
+        eager: bool
+            取得時に全ての値をパースするかどうか (True: パースする, False: 初回アクセス時にパースする)
+            デフォルトでは初回アクセス時にパースする
 
         Returns
         -------
         PrivateMessageCollection
             メッセージオブジェクトのリスト
         """
-        bodies = []
+        return PrivateMessageCollection._from_ids_impl(client, message_ids, eager)
 
-        for message_id in message_ids:
-            bodies.append(
-                {
-                    "item": message_id,
-                    "moduleName": "dashboard/messages/DMViewMessageModule",
-                }
-            )
+    @staticmethod
+    def _from_ids_impl(
+        client: "Client", message_ids: list[int], eager: bool = False
+    ) -> "PrivateMessageCollection":
+        """メッセージIDのリストからメッセージオブジェクトのリストを取得する
+
+        ログインチェックを行わないため、チェック済みの呼び出し元からのみ利用する
+
+        Parameters
+        ----------
+        client: Client
+            クライアント
+        message_ids: list[int]
+            メッセージIDのリスト
+        eager: bool
+            取得時に全ての値をパースするかどうか
+
+        Returns
+        -------
+        PrivateMessageCollection
+            メッセージオブジェクトのリスト
+        """
+        bodies = [
+            {"item": message_id, "moduleName": "dashboard/messages/DMViewMessageModule"}
+            for message_id in message_ids
+        ]
 
         responses: tuple[httpx.Response | Exception] = client.amc_client.request(
             bodies, return_exceptions=True
@@ -70,30 +117,82 @@ class PrivateMessageCollection(list["PrivateMessage"]):
 
             html = BeautifulSoup(response.json()["body"], "lxml")
 
-            sender, recipient = html.select("div.pmessage div.header span.printuser")
-
-            subject_element = html.select_one("div.pmessage div.header span.subject")
-            body_element = html.select_one("div.pmessage div.body")
-            odate_element = html.select_one("div.header span.odate")
-
-            messages.append(
-                PrivateMessage(
-                    client=client,
-                    id=message_ids[index],
-                    sender=user_parser(client, sender),
-                    recipient=user_parser(client, recipient),
-                    subject=subject_element.get_text() if subject_element else "",
-                    body=body_element.get_text() if body_element else "",
-                    created_at=(
-                        odate_parser(odate_element)
-                        if odate_element
-                        else datetime.fromtimestamp(0)
-                    ),
+            # div.pmessageの構造は固定なので、headerを1回だけ走査して各要素を取得する
+            pmessage = html.find("div", class_="pmessage")
+            if not isinstance(pmessage, Tag):
+                raise exceptions.NoElementException(
+                    f"Message element is not found: {message_ids[index]}"
+                )
+            header = pmessage.find("div", class_="header")
+            if not isinstance(header, Tag):
+                raise exceptions.NoElementException(
+                    f"Header element is not found: {message_ids[index]}"
                 )
+
+            printuser_elements: list[Tag] = []
+            subject_element: Tag | None = None
+            odate_element: Tag | None = None
+            for span in header.find_all(
+                "span", class_=["printuser", "subject", "odate"]
+            ):
+                span_classes = span.get_attribute_list("class")
+                if "printuser" in span_classes:
+                    printuser_elements.append(span)
+                elif "subject" in span_classes and subject_element is None:
+                    subject_element = span
+                elif "odate" in span_classes and odate_element is None:
+                    odate_element = span
+
+            if len(printuser_elements) != 2:
+                raise exceptions.NoElementException(
+                    f"Sender or recipient element is not found: {message_ids[index]}"
+                )
+            sender, recipient = printuser_elements
+
+            body_element = pmessage.find("div", class_="body")
+
+            message = PrivateMessage._from_elements(
+                client,
+                message_ids[index],
+                _PrivateMessageElements(
+                    sender=sender,
+                    recipient=recipient,
+                    subject=subject_element,
+                    body=body_element if isinstance(body_element, Tag) else None,
+                    odate=odate_element,
+                ),
             )
+            if eager:
+                message.parse()
+
+            messages.append(message)
 
         return PrivateMessageCollection(messages)
 
+    @staticmethod
+    def _parse_message_ids(html) -> list[int]:
+        """受信・送信箱のHTMLからメッセージIDのリストを取得する
+
+        Parameters
+        ----------
+        html: lxml.html.HtmlElement
+            受信・送信箱のHTML
+
+        Returns
+        -------
+        list[int]
+            メッセージIDのリスト
+        """
+        # tr.messageのdata-href末尾の数字を取得
+        # 属性値だけが必要なので、xpathで文字列として直接取り出す
+        return [
+            int(data_href.rpartition("/")[2])
+            for data_href in html.xpath(
+                "//tr[contains(concat(' ', normalize-space(@class), ' '), ' message ')]"
+                "/@data-href"
+            )
+        ]
+
     @staticmethod
     @login_required
     def _acquire(client: "Client", module_name: str):
@@ -116,43 +215,49 @@ class PrivateMessageCollection(list["PrivateMessage"]):
             httpx.Response, client.amc_client.request([{"moduleName": module_name}])[0]
         )
 
-        html = BeautifulSoup(response.json()["body"], "lxml")
+        html = lxml_html.fromstring(response.json()["body"])
         # pagerの最後から2番目の要素を取得
         # pageが存在しない場合は1ページのみ
-        pager: ResultSet[Tag] = html.select("div.pager span.target")
-        max_page: int = int(pager[-2].get_text()) if len(pager) > 2 else 1
+        pager = cast(
+            list[lxml_html.HtmlElement],
+            html.xpath(
+                "//div[contains(concat(' ', normalize-space(@class), ' '), ' pager ')]"
+                "//span[contains(concat(' ', normalize-space(@class), ' '), ' target ')]"
+            ),
+        )
+        max_page: int = int(pager[-2].text_content()) if len(pager) > 2 else 1
+
+        # 1ページ目はpager取得時のレスポンスをそのまま使う
+        message_ids = PrivateMessageCollection._parse_message_ids(html)
 
         if max_page > 1:
-            # メッセージ取得
+            # 2ページ目以降のメッセージ取得
             bodies = [
                 {"page": page, "moduleName": module_name}
-                for page in range(1, max_page + 1)
+                for page in range(2, max_page + 1)
             ]
 
             responses: tuple[httpx.Response] = cast(
                 tuple[httpx.Response],
                 client.amc_client.request(bodies, return_exceptions=False),
             )
-        else:
-            responses = (response,)
 
-        message_ids = []
-        for response in responses:
-            html = BeautifulSoup(response.json()["body"], "lxml")
-            # tr.messageのdata-href末尾の数字を取得
-            message_ids.extend(
-                [
-                    int(str(tr["data-href"]).split("/")[-1])
-                    for tr in html.select("tr.message")
-                ]
-            )
+            for response in responses:
+                message_ids.extend(
+                    PrivateMessageCollection._parse_message_ids(
+                        lxml_html.fromstring(response.json()["body"])
+                    )
+                )
 
-        return PrivateMessageCollection.from_ids(client, message_ids)
+        # ログインチェックは済んでいるので、チェックなしの実装を直接呼ぶ
+        return PrivateMessageCollection._from_ids_impl(client, message_ids)
 
 
 class PrivateMessageInbox(PrivateMessageCollection):
     @staticmethod
-    def from_ids(client: "Client", message_ids: list[int]) -> "PrivateMessageInbox":
+    def from_ids(
+        client: "Client", message_ids: list[int], eager: bool = False
+    ) -> "PrivateMessageInbox":
         """メッセージIDのリストから受信箱のメッセージオブジェクトのリストを取得する
 
         Parameters
@@ -161,6 +266,8 @@ class PrivateMessageInbox(PrivateMessageCollection):
             クライアント
         message_ids: list[int]
             メッセージIDのリスト
+        eager: bool
+            取得時に全ての値をパースするかどうか
 
         Returns
         -------
@@ -168,7 +275,7 @@ class PrivateMessageInbox(PrivateMessageCollection):
             受信箱のメッセージオブジェクトのリスト
         """
         return PrivateMessageInbox(
-            PrivateMessageCollection.from_ids(client, message_ids)
+            PrivateMessageCollection.from_ids(client, message_ids, eager)
         )
 
     @staticmethod
@@ -194,7 +301,9 @@ class PrivateMessageInbox(PrivateMessageCollection):
 
 class PrivateMessageSentBox(PrivateMessageCollection):
     @staticmethod
-    def from_ids(client: "Client", message_ids: list[int]) -> "PrivateMessageSentBox":
+    def from_ids(
+        client: "Client", message_ids: list[int], eager: bool = False
+    ) -> "PrivateMessageSentBox":
         """メッセージIDのリストから受信箱のメッセージオブジェクトのリストを取得する
 
         Parameters
@@ -203,6 +312,8 @@ class PrivateMessageSentBox(PrivateMessageCollection):
             クライアント
         message_ids: list[int]
             メッセージIDのリスト
+        eager: bool
+            取得時に全ての値をパースするかどうか
 
         Returns
         -------
@@ -210,7 +321,7 @@ class PrivateMessageSentBox(PrivateMessageCollection):
             受信箱のメッセージオブジェクトのリスト
         """
         return PrivateMessageSentBox(
-            PrivateMessageCollection.from_ids(client, message_ids)
+            PrivateMessageCollection.from_ids(client, message_ids, eager)
         )
 
     @staticmethod
@@ -232,10 +343,22 @@ class PrivateMessageSentBox(PrivateMessageCollection):
         )
 
 
-@dataclass
+class _PrivateMessageElements(NamedTuple):
+    """パース前のメッセージの各要素"""
+
+    sender: Tag
+    recipient: Tag
+    subject: Tag | None
+    body: Tag | None
+    odate: Tag | None
+
+
+@dataclass(init=False, repr=False, slots=True)
 class PrivateMessage:
     """プライベートメッセージオブジェクト
 
+    from_idsで取得した場合、sender, recipient, subject, body, created_at は初回アクセス時にパースされる
+
     Attributes
     ----------
     client: Client
@@ -256,15 +379,116 @@ class PrivateMessage:
 
     client: "Client"
     id: int
-    sender: "AbstractUser"
-    recipient: "AbstractUser"
-    subject: str
-    body: str
-    created_at: datetime
+    # 以下はパース結果のキャッシュのため、比較や表示には使わない
+    _sender: Optional["AbstractUser"] = field(default=None, repr=False, compare=False)
+    _recipient: Optional["AbstractUser"] = field(
+        default=None, repr=False, compare=False
+    )
+    _subject: Optional[str] = field(default=None, repr=False, compare=False)
+    _body: Optional[str] = field(default=None, repr=False, compare=False)
+    _created_at: Optional[datetime] = field(default=None, repr=False, compare=False)
+    _elements: Optional[_PrivateMessageElements] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __init__(
+        self,
+        client: "Client",
+        id: int,
+        sender: Optional["AbstractUser"] = None,
+        recipient: Optional["AbstractUser"] = None,
+        subject: Optional[str] = None,
+        body: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ):
+        self.client = client
+        self.id = id
+        self._sender = sender
+        self._recipient = recipient
+        self._subject = subject
+        self._body = body
+        self._created_at = created_at
+        self._elements = None
+
+    @staticmethod
+    def _from_elements(
+        client: "Client", id: int, elements: _PrivateMessageElements
+    ) -> "PrivateMessage":
+        """パース前の要素からメッセージオブジェクトを作成する (各値は初回アクセス時にパースされる)"""
+        message = PrivateMessage(client, id)
+        message._elements = elements
+        return message
 
     def __str__(self):
         return f"PrivateMessage(id={self.id}, sender={self.sender}, recipient={self.recipient}, subject={self.subject})"
 
+    def __repr__(self):
+        # 未パースの値があれば先にパースし、キャッシュの初期値ではなく実際の値を表示する
+        self.parse()
+        return (
+            f"PrivateMessage(client={self.client!r}, id={self.id!r}, "
+            f"sender={self._sender!r}, recipient={self._recipient!r}, "
+            f"subject={self._subject!r}, body={self._body!r}, "
+            f"created_at={self._created_at!r})"
+        )
+
+    def _get_elements(self) -> _PrivateMessageElements:
+        if self._elements is None:
+            raise exceptions.NoElementException(
+                f"Message elements are not found: {self.id}"
+            )
+        return self._elements
+
+    @property
+    def sender(self) -> "AbstractUser":
+        if self._sender is None:
+            self._sender = user_parser(self.client, self._get_elements().sender)
+        return self._sender
+
+    @property
+    def recipient(self) -> "AbstractUser":
+        if self._recipient is None:
+            self._recipient = user_parser(self.client, self._get_elements().recipient)
+        return self._recipient
+
+    @property
+    def subject(self) -> str:
+        if self._subject is None:
+            subject_element = self._get_elements().subject
+            self._subject = subject_element.get_text() if subject_element else ""
+        return self._subject
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            body_element = self._get_elements().body
+            self._body = body_element.get_text() if body_element else ""
+        return self._body
+
+    @property
+    def created_at(self) -> datetime:
+        if self._created_at is None:
+            odate_element = self._get_elements().odate
+            self._created_at = (
+                odate_parser(odate_element)
+                if odate_element
+                else datetime.fromtimestamp(0)
+            )
+        return self._created_at
+
+    def parse(self) -> "PrivateMessage":
+        """未パースの値を全てパースし、保持しているHTML要素を解放する
+
+        Returns
+        -------
+        PrivateMessage
+            自身
+        """
+        if self._elements is not None:
+            _ = self.sender, self.recipient, self.subject, self.body, self.created_at
+            self._elements = None
+        return self
+
     @staticmethod
     def from_id(client: "Client", message_id: int) -> "PrivateMessage":
         """メッセージIDからメッセージオブジェクトを取得する
@@ -1,12 +1,13 @@
-import re
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Optional
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 import httpx
 
 from ..common import exceptions
 from ..common.decorators import login_required
 from ..util.quick_module import QMCUser, QuickModule
+from ..util.ttl_cache import TTLCache
 from .forum_category import ForumCategoryCollection
 from .page import Page, PageCollection, SearchPagesQuery
 from .site_application import SiteApplication
@@ -16,6 +17,54 @@ if TYPE_CHECKING:
     from .client import Client
     from .user import User
 
+# from_unix_nameでサイト情報を取り出すための (キー, 開始文字列, 終端文字列)
+# WIKIREQUEST.info.siteId = xxxx; / siteUnixName = "xxxx"; / domain = "xxxx";
+_SITE_INFO_MARKERS = (
+    ("siteId", "WIKIREQUEST.info.siteId = ", ";"),
+    ("siteUnixName", 'WIKIREQUEST.info.siteUnixName = "', '";'),
+    ("domain", 'WIKIREQUEST.info.domain = "', '";'),
+)
+# 上記の値とtitleタグは<head>内にあるため、まずは</head>までを走査する
+# </head>が見つからない場合はHTMLの先頭からこの文字数だけを走査する
+_SITE_INFO_SEARCH_WINDOW = 65536
+
+# from_unix_nameで取得したサイト情報を保持する秒数と件数
+SITE_INFO_CACHE_TTL = 3600
+SITE_INFO_CACHE_SIZE = 128
+
+
+class _SiteInfo(NamedTuple):
+    """from_unix_nameで取得するサイト情報"""
+
+    id: int
+    title: str
+    unix_name: str
+    domain: str
+    ssl_supported: bool
+
+
+# from_unix_nameの取得結果のキャッシュ
+# 要求されたUNIX名 -> サイト情報
+_site_info_cache: TTLCache[str, _SiteInfo] = TTLCache(
+    SITE_INFO_CACHE_SIZE, SITE_INFO_CACHE_TTL
+)
+
+
+# invite_userで送信するリクエストボディの固定部分
+_INVITE_USER_BODY = {
+    "action": "ManageSiteMembershipAction",
+    "event": "inviteMember",
+    "moduleName": "Empty",
+}
+
+# member_lookupの結果を保持する秒数と件数 (Siteインスタンスごと)
+MEMBER_LOOKUP_CACHE_TTL = 3600
+MEMBER_LOOKUP_CACHE_SIZE = 1024
+
+# SitePageMethods.get(raise_when_not_found=False)で見つからなかったページを記憶しておく秒数と件数
+MISSING_PAGE_CACHE_TTL = 300
+MISSING_PAGE_CACHE_SIZE = 512
+
 
 class SitePagesMethods:
     def __init__(self, site: "Site"):
@@ -44,6 +93,10 @@ class SitePagesMethods:
 class SitePageMethods:
     def __init__(self, site: "Site"):
         self.site = site
+        # getで見つからなかったフルネーム -> True
+        self._missing: TTLCache[str, bool] = TTLCache(
+            MISSING_PAGE_CACHE_SIZE, MISSING_PAGE_CACHE_TTL
+        )
 
     def get(self, fullname: str, raise_when_not_found: bool = True) -> Optional["Page"]:
         """フルネームからページを取得する
@@ -54,21 +107,62 @@ class SitePageMethods:
             ページのフルネーム
         raise_when_not_found: bool
             ページが見つからなかった場合に例外を発生させるかどうか させない場合はNoneを返す
+            Falseの場合、見つからなかったページはMISSING_PAGE_CACHE_TTL秒の間記憶され、
+            その間の同じフルネームに対する呼び出しはリクエストせずにNoneを返す
 
         Returns
         -------
         Page
             ページオブジェクト
         """
+        # 存在確認 (raise_when_not_found=False) のときだけ、直近で見つからなかったページをリクエストせずに扱う
+        # 例外を送出する通常の取得では、他所で作成されたページを見落とさないよう毎回検索する
+        if not raise_when_not_found and self._missing.get(fullname) is not None:
+            return None
+
+        # 対象は高々1ページなので、ページングが発生しないよう1件に絞って検索する
         res = PageCollection.search_pages(
-            self.site, SearchPagesQuery(fullname=fullname)
+            self.site, SearchPagesQuery(fullname=fullname, limit=1, perPage=1)
         )
         if len(res) == 0:
             if raise_when_not_found:
                 raise exceptions.NotFoundException(f"Page is not found: {fullname}")
+            self._missing.set(fullname, True)
             return None
+
+        # 以前の存在確認で見つからなかったページでも、見つかった時点で記憶を消す
+        self._missing.discard(fullname)
         return res[0]
 
+    def get_bulk(
+        self, fullnames: list[str], raise_when_not_found: bool = True
+    ) -> "PageCollection":
+        """フルネームのリストからページをまとめて取得する
+
+        Parameters
+        ----------
+        fullnames: list[str]
+            ページのフルネームのリスト
+        raise_when_not_found: bool
+            ページが見つからなかった場合に例外を発生させるかどうか させない場合は見つからなかったページを除いて返す
+
+        Returns
+        -------
+        PageCollection
+            ページのコレクション
+        """
+        pages = []
+        for fullname, page in zip(
+            fullnames, PageCollection._acquire_pages_by_fullnames(self.site, fullnames)
+        ):
+            if page is None:
+                if raise_when_not_found:
+                    raise exceptions.NotFoundException(f"Page is not found: {fullname}")
+                continue
+            pages.append(page)
+
+        return PageCollection(self.site, pages)
+
     def create(
         self,
         fullname: str,
@@ -92,6 +186,7 @@ class SitePageMethods:
         force_edit: bool
             ページが存在する場合に上書きするかどうか
         """
+        self._missing.discard(fullname)
         return Page.create_or_edit(
             site=self.site,
             fullname=fullname,
@@ -112,7 +207,7 @@ class SiteForumMethods:
         return ForumCategoryCollection.acquire_all(self.site)
 
 
-@dataclass
+@dataclass(eq=False, repr=False, slots=True)
 class Site:
     """サイトオブジェクト
 
@@ -128,6 +223,8 @@ class Site:
         サイトのドメイン
     ssl_supported: bool
         SSL対応しているかどうか
+    url: str
+        サイトのURL
 
     Raises
     ------
@@ -145,18 +242,73 @@ class Site:
     domain: str
     ssl_supported: bool
 
-    _members = None
-    _moderators = None
-    _admins = None
+    # サイトのURL (生成時に確定する)
+    url: str = field(init=False, repr=False, compare=False)
+
+    # SiteMember.getの結果をこのインスタンスに結び付け直したもの
+    # グループ -> (共有キャッシュのリスト, このインスタンスに結び付けたリスト)
+    _member_lists: dict[str, tuple[list[SiteMember], list[SiteMember]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    # member_lookupの結果のキャッシュ
+    # (ユーザー名, ユーザーID) -> 結果
+    _member_lookup_cache: TTLCache[tuple[str, int | None], bool] = field(
+        default_factory=lambda: TTLCache(
+            MEMBER_LOOKUP_CACHE_SIZE, MEMBER_LOOKUP_CACHE_TTL
+        ),
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    # 各メソッド群 (初回アクセス時に生成)
+    _pages: Optional[SitePagesMethods] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _page: Optional[SitePageMethods] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _forum: Optional[SiteForumMethods] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
-        self.pages = SitePagesMethods(self)
-        self.page = SitePageMethods(self)
-        self.forum = SiteForumMethods(self)
+        # 同じサイトを参照するオブジェクト間で文字列を共有する
+        self.unix_name = sys.intern(self.unix_name)
+        self.domain = sys.intern(self.domain)
+        self.url = f'http{"s" if self.ssl_supported else ""}://{self.domain}'
 
     def __str__(self):
         return f"Site(id={self.id}, title={self.title}, unix_name={self.unix_name})"
 
+    __repr__ = __str__
+
+    def __eq__(self, other):
+        # clientを含む全フィールドの比較は重いため、サイトIDのみで比較する
+        return isinstance(other, Site) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    @property
+    def pages(self) -> SitePagesMethods:
+        if self._pages is None:
+            self._pages = SitePagesMethods(self)
+        return self._pages
+
+    @property
+    def page(self) -> SitePageMethods:
+        if self._page is None:
+            self._page = SitePageMethods(self)
+        return self._page
+
+    @property
+    def forum(self) -> SiteForumMethods:
+        if self._forum is None:
+            self._forum = SiteForumMethods(self)
+        return self._forum
+
     @staticmethod
     def from_unix_name(client: "Client", unix_name: str) -> "Site":
         """UNIX名からサイトオブジェクトを取得する
@@ -173,66 +325,192 @@ class Site:
         Site
             サイトオブジェクト
         """
-        # サイト情報を取得
-        # リダイレクトには従う
-        response = httpx.get(
+        # サイト情報はほぼ変化しないため、一定時間はキャッシュを使う
+        # Siteオブジェクト自体はクライアントごとに作り直す
+        site_info = _site_info_cache.get(unix_name)
+        if site_info is None:
+            site_info = Site._fetch_site_info(client, unix_name)
+            _site_info_cache.set(unix_name, site_info)
+
+        return Site(
+            client=client,
+            id=site_info.id,
+            title=site_info.title,
+            unix_name=site_info.unix_name,
+            domain=site_info.domain,
+            ssl_supported=site_info.ssl_supported,
+        )
+
+    @staticmethod
+    def exists(client: "Client", unix_name: str) -> bool:
+        """UNIX名のサイトが存在するかどうかを調べる
+
+        本文を取得しないHEADリクエストで確認する
+
+        Parameters
+        ----------
+        client: Client
+            クライアント
+        unix_name: str
+            サイトのUNIX名
+
+        Returns
+        -------
+        bool
+            サイトが存在すればTrue
+        """
+        # from_unix_nameで取得済みであればリクエストしない
+        if _site_info_cache.get(unix_name) is not None:
+            return True
+
+        response = client.http_client.head(
             f"http://{unix_name}.wikidot.com",
             follow_redirects=True,
             timeout=client.amc_client.config.request_timeout,
         )
+        return response.status_code != httpx.codes.NOT_FOUND
 
-        # サイトが存在しない場合
-        if response.status_code == httpx.codes.NOT_FOUND:
-            raise exceptions.NotFoundException(
-                f"Site is not found: {unix_name}.wikidot.com"
-            )
+    @staticmethod
+    def _parse_site_info(source: str, endpos: int) -> tuple[dict[str, str], str | None]:
+        """サイトのHTMLの先頭endpos文字からWIKIREQUEST.infoの値とタイトルを取り出す
+
+        Parameters
+        ----------
+        source: str
+            サイトのHTML
+        endpos: int
+            走査する範囲の終端
 
-        # サイトが存在する場合
-        source = response.text
+        Returns
+        -------
+        tuple[dict[str, str], str | None]
+            WIKIREQUEST.infoのキーと値の辞書, タイトル (見つからなければNone)
+        """
+        # 値の前後は固定文字列なので、正規表現を使わずにstr.findで切り出す
+        site_info: dict[str, str] = {}
+        for key, prefix, suffix in _SITE_INFO_MARKERS:
+            value = Site._find_between(source, prefix, suffix, endpos)
+            if value is not None:
+                site_info[key] = value
+
+        # siteIdは数値のみ有効
+        if "siteId" in site_info and not site_info["siteId"].isdigit():
+            del site_info["siteId"]
+
+        title = Site._find_between(source, "<title>", "</title>", endpos)
+        return site_info, title
+
+    @staticmethod
+    def _find_between(source: str, prefix: str, suffix: str, endpos: int) -> str | None:
+        """source[:endpos]内で最初にprefixが現れた位置から、次のsuffixまでの文字列を返す
+
+        Parameters
+        ----------
+        source: str
+            対象の文字列
+        prefix: str
+            開始文字列
+        suffix: str
+            終端文字列
+        endpos: int
+            走査する範囲の終端
+
+        Returns
+        -------
+        str | None
+            prefixとsuffixの間の文字列 見つからなければNone
+        """
+        start = source.find(prefix, 0, endpos)
+        if start == -1:
+            return None
+        start += len(prefix)
+        end = source.find(suffix, start, endpos)
+        if end == -1:
+            return None
+        return source[start:end]
+
+    @staticmethod
+    def _fetch_site_info(client: "Client", unix_name: str) -> _SiteInfo:
+        """サイトのトップページからサイト情報を取得する
+
+        Parameters
+        ----------
+        client: Client
+            クライアント
+        unix_name: str
+            サイトのUNIX名
+
+        Returns
+        -------
+        _SiteInfo
+            サイト情報
+        """
+        # サイト情報を取得
+        # リダイレクトには従う
+        # サイト情報は<head>内にあるため、</head>を受信した時点で読み込みを打ち切る
+        with client.http_client.stream(
+            "GET",
+            f"http://{unix_name}.wikidot.com",
+            follow_redirects=True,
+            timeout=client.amc_client.config.request_timeout,
+        ) as response:
+            # サイトが存在しない場合
+            if response.status_code == httpx.codes.NOT_FOUND:
+                raise exceptions.NotFoundException(
+                    f"Site is not found: {unix_name}.wikidot.com"
+                )
+
+            chunks: list[str] = []
+            for chunk in response.iter_text():
+                # チャンク境界をまたぐ場合に備えて直前のチャンクの末尾も含めて探す
+                tail = chunks[-1][-6:] if chunks else ""
+                chunks.append(chunk)
+                if "</head>" in tail + chunk:
+                    break
+
+            # SSL対応チェック
+            ssl_supported = response.url.scheme == "https"
+
+        source = "".join(chunks)
+
+        # まずは<head>内だけを走査し、見つからない値があれば受信した全体を走査し直す
+        head_end = source.find("</head>")
+        if head_end == -1:
+            head_end = _SITE_INFO_SEARCH_WINDOW
+        site_info, title = Site._parse_site_info(source, head_end)
+        if len(site_info) < 3 or title is None:
+            site_info, title = Site._parse_site_info(source, len(source))
 
         # id : WIKIREQUEST.info.siteId = xxxx;
-        id_match = re.search(r"WIKIREQUEST\.info\.siteId = (\d+);", source)
-        if id_match is None:
+        if "siteId" not in site_info:
             raise exceptions.UnexpectedException(
                 f"Cannot find site id: {unix_name}.wikidot.com"
             )
-        site_id = int(id_match.group(1))
+        site_id = int(site_info["siteId"])
 
         # title : titleタグ
-        title_match = re.search(r"<title>(.*?)</title>", source)
-        if title_match is None:
+        if title is None:
             raise exceptions.UnexpectedException(
                 f"Cannot find site title: {unix_name}.wikidot.com"
             )
-        title = title_match.group(1)
 
         # unix_name : WIKIREQUEST.info.siteUnixName = "xxxx";
-        unix_name_match = re.search(
-            r'WIKIREQUEST\.info\.siteUnixName = "(.*?)";', source
-        )
-        if unix_name_match is None:
+        if "siteUnixName" not in site_info:
             raise exceptions.UnexpectedException(
                 f"Cannot find site unix_name: {unix_name}.wikidot.com"
             )
-        unix_name = unix_name_match.group(1)
 
         # domain :WIKIREQUEST.info.domain = "xxxx";
-        domain_match = re.search(r'WIKIREQUEST\.info\.domain = "(.*?)";', source)
-        if domain_match is None:
+        if "domain" not in site_info:
             raise exceptions.UnexpectedException(
                 f"Cannot find site domain: {unix_name}.wikidot.com"
             )
-        domain = domain_match.group(1)
-
-        # SSL対応チェック
-        ssl_supported = str(response.url).startswith("https")
 
-        return Site(
-            client=client,
+        return _SiteInfo(
             id=site_id,
             title=title,
-            unix_name=unix_name,
-            domain=domain,
+            unix_name=site_info["siteUnixName"],
+            domain=site_info["domain"],
             ssl_supported=ssl_supported,
         )
 
@@ -246,21 +524,23 @@ class Site:
         """サイトへの未処理の参加申請を取得する"""
         return SiteApplication.acquire_all(self)
 
+    def process_applications(
+        self, applications: list[SiteApplication], action: str
+    ) -> None:
+        """複数の参加申請をまとめて処理する ("accept" または "decline")
+
+        処理に成功した申請があれば、メンバーのキャッシュは破棄される
+        """
+        SiteApplication.process_all(self, applications, action)
+
     @login_required
     def invite_user(self, user: "User", text: str):
-        """ユーザーをサイトに招待する"""
+        """ユーザーをサイトに招待する
+
+        招待に成功した場合、メンバーのキャッシュは破棄される
+        """
         try:
-            self.amc_request(
-                [
-                    {
-                        "action": "ManageSiteMembershipAction",
-                        "event": "inviteMember",
-                        "user_id": user.id,
-                        "text": text,
-                        "moduleName": "Empty",
-                    }
-                ]
-            )
+            self.amc_request([{**_INVITE_USER_BODY, "user_id": user.id, "text": text}])
         except exceptions.WikidotStatusCodeException as e:
             if e.status_code == "already_invited":
                 raise exceptions.TargetErrorException(
@@ -273,38 +553,71 @@ class Site:
             else:
                 raise e
 
+        self.refresh_members()
+
     def get_url(self):
         """サイトのURLを取得する"""
-        return f'http{"s" if self.ssl_supported else ""}://{self.domain}'
+        return self.url
+
+    def prefetch_members(self):
+        """members, moderators, adminsを同時に取得しておく
+
+        取得結果はSiteMember.getのキャッシュに保持され、以降のプロパティアクセスで使われる
+        """
+        SiteMember.get_groups(self, ["", "moderators", "admins"])
+
+    def refresh_members(self):
+        """members, moderators, adminsとmember_lookupのキャッシュを破棄する
+
+        次回のアクセス時に再取得される
+        members, moderators, adminsは同じクライアントから同じサイトを指す他のSiteインスタンスのキャッシュも破棄される
+        """
+        SiteMember.clear_cache(self)
+        self._member_lookup_cache.clear()
 
     @property
     def members(self):
-        if self._members is None:
-            self._members = SiteMember.get(self)
-        return self._members
+        return SiteMember.get(self)
 
     @property
     def moderators(self):
-        if self._moderators is None:
-            self._moderators = SiteMember.get(self, "moderators")
-        return self._moderators
+        return SiteMember.get(self, "moderators")
 
     @property
     def admins(self):
-        if self._admins is None:
-            self._admins = SiteMember.get(self, "admins")
-        return self._admins
+        return SiteMember.get(self, "admins")
 
     def member_lookup(self, user_name: str, user_id: int | None = None):
-        users: list["QMCUser"] = QuickModule.member_lookup(self.id, user_name)
+        """ユーザーがサイトのメンバーかどうかを調べる
+
+        結果はMEMBER_LOOKUP_CACHE_TTL秒の間このSiteインスタンスにキャッシュされる
+        (最大MEMBER_LOOKUP_CACHE_SIZE件、refresh_membersで破棄される)
+
+        Parameters
+        ----------
+        user_name: str
+            ユーザー名
+        user_id: int | None
+            ユーザーID 指定された場合はIDも一致するかを確認する
+
+        Returns
+        -------
+        bool
+            メンバーであればTrue
+        """
+        cache_key = (user_name, user_id)
+        cached = self._member_lookup_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        if len(users) == 0:
-            return False
+        result = self._member_lookup(user_name, user_id)
+        self._member_lookup_cache.set(cache_key, result)
+        return result
 
-        for user in users:
-            if user.name.strip() == user_name and (
-                user_id is None or user.id == user_id
-            ):
-                return True
+    def _member_lookup(self, user_name: str, user_id: int | None = None) -> bool:
+        users: list["QMCUser"] = QuickModule.member_lookup(self.id, user_name)
 
-        return False
+        return any(
+            user.name.strip() == user_name and (user_id is None or user.id == user_id)
+            for user in users
+        )
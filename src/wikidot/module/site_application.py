@@ -1,18 +1,46 @@
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from itertools import islice
+from typing import TYPE_CHECKING, cast
 
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 
 from ..common import exceptions
 from ..common.decorators import login_required
-from ..util.parser import user as user_parser
+from ..util.parser import user_lxml as user_parser
 
 if TYPE_CHECKING:
     from ..module.site import Site
     from ..module.user import AbstractUser
 
+# 権限がない場合にレスポンスに含まれるログインボタンの処理
+_LOGIN_REQUIRED_MARKER = "WIKIDOT.page.listeners.loginClick(event)"
 
-@dataclass
+# process_allで指定できる処理の種類
+_VALID_ACTIONS = frozenset({"accept", "decline"})
+
+# 処理の種類ごとに申請者へ送るメッセージ
+_PROCESS_MESSAGES = {
+    "accept": "your application has been accepted",
+    "decline": "your application has been declined",
+}
+
+# process_allで送信するリクエストボディの固定部分
+_PROCESS_BODY = {
+    "action": "ManageSiteMembershipAction",
+    "event": "acceptApplication",
+    "moduleName": "Empty",
+}
+
+# acquire_allで使うXPath (コンパイル済み)
+# 申請者 (h3 span.printuser) と申請文を含むtableを文書順に取り出す
+_XPATH_USER = etree.XPath(
+    "//h3//span[contains(concat(' ', normalize-space(@class), ' '), ' printuser ')]"
+)
+_XPATH_TEXT_WRAPPER = etree.XPath("//table")
+
+
+@dataclass(slots=True)
 class SiteApplication:
     site: "Site"
     user: "AbstractUser"
@@ -42,66 +70,112 @@ class SiteApplication:
 
         body = response.json()["body"]
 
-        if "WIKIDOT.page.listeners.loginClick(event)" in body:
+        if _LOGIN_REQUIRED_MARKER in body:
             raise exceptions.ForbiddenException(
                 "You are not allowed to access this page"
             )
 
-        html = BeautifulSoup(response.json()["body"], "lxml")
+        # 申請がなく本文が空の場合はパースせずに返す
+        # (lxmlは空文字列をパースできない)
+        if not body.strip():
+            return []
+
+        html = lxml_html.fromstring(body)
 
         applications = []
 
-        user_elements = html.select("h3 span.printuser")
-        text_wrapper_elements = html.select("table")
+        user_elements = cast(list[lxml_html.HtmlElement], _XPATH_USER(html))
+        text_wrapper_elements = cast(
+            list[lxml_html.HtmlElement], _XPATH_TEXT_WRAPPER(html)
+        )
 
         if len(user_elements) != len(text_wrapper_elements):
             raise exceptions.UnexpectedException(
                 "Length of user_elements and text_wrapper_elements are different"
             )
 
-        for i in range(len(user_elements)):
-            user_element = user_elements[i]
-            text_wrapper_element = text_wrapper_elements[i]
-
+        for user_element, text_wrapper_element in zip(
+            user_elements, text_wrapper_elements
+        ):
             user = user_parser(site.client, user_element)
-            text = text_wrapper_element.select("td")[1].text.strip()
+            # 2番目のtdが申請文 (リストを作らずに子孫を順にたどる)
+            text_element = next(islice(text_wrapper_element.iter("td"), 1, None), None)
+            if text_element is None:
+                raise exceptions.NoElementException("Cannot find application text")
+            text = text_element.text_content().strip()
 
             applications.append(SiteApplication(site, user, text))
 
         return applications
 
+    @staticmethod
     @login_required
-    def _process(self, action: str):
-        """申請を処理する
+    def process_all(
+        site: "Site", applications: list["SiteApplication"], action: str
+    ) -> None:
+        """複数の申請をまとめて処理する
+
+        全ての申請の処理を1回のAMCリクエストとして同時に送信する
+        1件でも処理に成功した場合、サイトのメンバーのキャッシュを破棄する
 
         Parameters
         ----------
+        site: Site
+            サイト
+        applications: list[SiteApplication]
+            処理する申請のリスト
         action: str
-            処理の種類
+            処理の種類 ("accept", "decline" のいずれか)
+
+        Raises
+        ------
+        NotFoundException
+            申請が存在しない場合 (全ての申請を送信した後、最初に失敗したものについて送出する)
         """
-        if action not in ["accept", "decline"]:
+        if action not in _VALID_ACTIONS:
             raise ValueError(f"Invalid action: {action}")
 
-        try:
-            self.site.amc_request(
-                [
-                    {
-                        "action": "ManageSiteMembershipAction",
-                        "event": "acceptApplication",
-                        "user_id": self.user.id,
-                        "text": f"your application has been {action}ed",
-                        "type": action,
-                        "moduleName": "Empty",
-                    }
-                ]
-            )
-        except exceptions.WikidotStatusCodeException as e:
-            if e.status_code == "no_application":
+        if len(applications) == 0:
+            return
+
+        responses = site.amc_request(
+            [
+                {
+                    **_PROCESS_BODY,
+                    "user_id": application.user.id,
+                    "text": _PROCESS_MESSAGES[action],
+                    "type": action,
+                }
+                for application in applications
+            ],
+            return_exceptions=True,
+        )
+
+        # 失敗した申請があっても、成功した分はメンバーが変化している可能性がある
+        if any(not isinstance(response, Exception) for response in responses):
+            site.refresh_members()
+
+        for application, response in zip(applications, responses):
+            if not isinstance(response, Exception):
+                continue
+            if (
+                isinstance(response, exceptions.WikidotStatusCodeException)
+                and response.status_code == "no_application"
+            ):
                 raise exceptions.NotFoundException(
-                    f"Application not found: {self.user}"
-                ) from e
-            else:
-                raise e
+                    f"Application not found: {application.user}"
+                ) from response
+            raise response
+
+    def _process(self, action: str):
+        """申請を処理する
+
+        Parameters
+        ----------
+        action: str
+            処理の種類
+        """
+        SiteApplication.process_all(self.site, [self], action)
 
     def accept(self):
         """申請を承認する"""
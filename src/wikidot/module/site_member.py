@@ -1,43 +1,114 @@
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, cast
 
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 
-from ..util.parser import odate as odate_parser
-from ..util.parser import user as user_parser
+from ..util.parser import odate_lxml as odate_parser
+from ..util.parser import user_lxml as user_parser
+from ..util.ttl_cache import TTLCache
 
 if TYPE_CHECKING:
     from .site import Site
     from .user import AbstractUser
 
+# SiteMember.getの結果を保持する秒数と件数
+MEMBERS_CACHE_TTL = 3600
+MEMBERS_CACHE_SIZE = 256
 
-@dataclass
+# 取得できるグループ ("" は全メンバー)
+_VALID_GROUPS = frozenset({"admins", "moderators", ""})
+
+# 全メンバーの取得時に1ページ目と同時に先読みするページ数
+# moderators / adminsは通常1ページに収まるため先読みしない
+MEMBERS_PREFETCH_PAGES = 4
+
+# SiteMember.getの結果のキャッシュ
+# 同じクライアントから同じサイトを指すSiteインスタンス間で共有する
+# (クライアントのid, サイトID, グループ) -> メンバーのリスト
+# キャッシュされたメンバーはクライアントへの参照を持つため、エントリがある間はidが再利用されない
+_members_cache: TTLCache[tuple[int, int, str], list["SiteMember"]] = TTLCache(
+    MEMBERS_CACHE_SIZE, MEMBERS_CACHE_TTL
+)
+
+# メンバー一覧のHTMLを解析するためのXPath (コンパイル済み)
+_ROWS_XPATH = etree.XPath("//table//tr")
+_PRINTUSER_XPATH = etree.XPath(
+    ".//*[contains(concat(' ', normalize-space(@class), ' '), ' printuser ')]"
+)
+_ODATE_XPATH = etree.XPath(
+    ".//*[contains(concat(' ', normalize-space(@class), ' '), ' odate ')]"
+)
+_PAGER_LINKS_XPATH = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' pager ')]//a"
+)
+
+
+def _find_all(xpath: etree.XPath, elem: Any) -> list[lxml_html.HtmlElement]:
+    """要素のリストを返すXPathを評価する"""
+    return cast(list[lxml_html.HtmlElement], xpath(elem))
+
+
+@dataclass(slots=True)
 class SiteMember:
     site: "Site"
     user: "AbstractUser"
     joined_at: datetime | None
 
     @staticmethod
-    def _parse(site: "Site", html: BeautifulSoup) -> list["SiteMember"]:
+    def _parse(
+        site: "Site",
+        html: lxml_html.HtmlElement,
+        users: dict[str, "AbstractUser"] | None = None,
+    ) -> list["SiteMember"]:
+        """メンバー一覧のHTMLを解析する
+
+        Parameters
+        ----------
+        site: Site
+            サイト
+        html: lxml.html.HtmlElement
+            メンバー一覧のHTML
+        users: dict[str, AbstractUser] | None
+            解析済みのユーザー (ユーザーリンクのonclick属性 -> ユーザー)
+            指定された場合、同じユーザーは再解析せずにこの辞書のオブジェクトを使い回す
+
+        Returns
+        -------
+        list[SiteMember]
+            メンバーのリスト
+        """
         members: list["SiteMember"] = []
 
-        for row in html.select("table tr"):
-            tds = row.select("td")
-            user_elem = tds[0].select_one(".printuser")
+        for row in _find_all(_ROWS_XPATH, html):
+            # 行の直下のtdだけを見ればよいので、子要素を直接たどる
+            tds = list(row.iterchildren("td"))
+            if len(tds) == 0:
+                continue
 
-            if user_elem is None:
+            user_elems = _find_all(_PRINTUSER_XPATH, tds[0])
+            if len(user_elems) == 0:
                 continue
 
-            user = user_parser(site.client, user_elem)
+            # onclick属性にユーザーIDが含まれるため、これをキーに解析結果を使い回す
+            user_links = user_elems[0].findall(".//a")
+            user_key = user_links[-1].get("onclick") if len(user_links) > 0 else None
+            if users is not None and user_key is not None and user_key in users:
+                user = users[user_key]
+            else:
+                user = user_parser(site.client, user_elems[0])
+                if users is not None and user_key is not None:
+                    users[user_key] = user
 
             # tdsが2つあったら加入日時がある
             if len(tds) == 2:
-                joined_at_elem = tds[1].select_one(".odate")
-                if joined_at_elem is None:
+                joined_at_elems = _find_all(_ODATE_XPATH, tds[1])
+                if len(joined_at_elems) == 0:
                     joined_at = None
                 else:
-                    joined_at = odate_parser(joined_at_elem)
+                    joined_at = odate_parser(joined_at_elems[0])
             else:
                 joined_at = None
 
@@ -46,37 +117,233 @@ class SiteMember:
         return members
 
     @staticmethod
-    def get(site: "Site", group: str | None = None) -> list["SiteMember"]:
+    def _get_cached(site: "Site", group: str) -> list["SiteMember"] | None:
+        """キャッシュされたメンバーを呼び出し元のサイトに結び付け直して返す
+
+        結び付け直したリストはSiteインスタンスに保持し、キャッシュが更新されるまで同じリストを返す
+        有効なキャッシュがない場合はNoneを返す
+        """
+        cached = _members_cache.get((id(site.client), site.id, group))
+        if cached is None:
+            return None
+
+        bound = site._member_lists.get(group)
+        if bound is None or bound[0] is not cached:
+            bound = (
+                cached,
+                [SiteMember(site, member.user, member.joined_at) for member in cached],
+            )
+            site._member_lists[group] = bound
+        return bound[1]
+
+    @staticmethod
+    def _set_cached(site: "Site", group: str, members: list["SiteMember"]) -> None:
+        _members_cache.set((id(site.client), site.id, group), members)
+        # 取得したメンバーは既にこのサイトに結び付いているため、そのまま保持する
+        site._member_lists[group] = (members, members)
+
+    @staticmethod
+    def clear_cache(site: "Site") -> None:
+        """サイトのメンバーのキャッシュを破棄する
+
+        同じクライアントから同じサイトを指す全てのSiteインスタンスで、次回の取得時に再取得される
+
+        Parameters
+        ----------
+        site: Site
+            サイト
+        """
+        for group in _VALID_GROUPS:
+            _members_cache.discard((id(site.client), site.id, group))
+        site._member_lists.clear()
+
+    @staticmethod
+    def get(
+        site: "Site", group: str | None = None, refresh: bool = False
+    ) -> list["SiteMember"]:
+        """サイトのメンバーを取得する
+
+        取得結果はMEMBERS_CACHE_TTL秒の間キャッシュされ、同じクライアントからの同じサイトに対する呼び出しで再利用される
+        参加申請の処理や招待を行うとキャッシュは破棄される (SiteMember.clear_cacheで明示的に破棄することもできる)
+
+        Parameters
+        ----------
+        site: Site
+            サイト
+        group: str | None
+            グループ ("admins", "moderators", "" のいずれか)
+            デフォルトでは全メンバー
+        refresh: bool
+            キャッシュを使わずに再取得するかどうか
+
+        Returns
+        -------
+        list[SiteMember]
+            メンバーのリスト
+        """
         if group is None:
             group = ""
 
-        if group not in ["admins", "moderators", ""]:
-            raise ValueError("Invalid group")
+        return SiteMember.get_groups(site, [group], refresh)[group]
+
+    @staticmethod
+    def iter_members(site: "Site", group: str | None = None) -> Iterator["SiteMember"]:
+        """サイトのメンバーを1ページずつ解析しながら順に返す
+
+        途中で走査をやめた場合、残りのページは解析されない
+        (まだ取得していないページがあれば、そのリクエストも行われない)
+        有効なキャッシュがあればその内容を返し、最後まで走査した場合は結果をキャッシュする
+
+        Parameters
+        ----------
+        site: Site
+            サイト
+        group: str | None
+            グループ ("admins", "moderators", "" のいずれか)
+            デフォルトでは全メンバー
+
+        Returns
+        -------
+        Iterator[SiteMember]
+            メンバーのイテレータ
+        """
+        if group is None:
+            group = ""
 
+        # ジェネレータの外で検証し、不正なグループは呼び出し時に例外を送出する
+        SiteMember._validate_groups([group])
+
+        cached = SiteMember._get_cached(site, group)
+        if cached is not None:
+            return iter(cached)
+
+        return SiteMember._iter_members(site, group)
+
+    @staticmethod
+    def _iter_members(site: "Site", group: str) -> Iterator["SiteMember"]:
+        users: dict[str, "AbstractUser"] = {}
         members: list["SiteMember"] = []
 
-        first_response = site.amc_request(
+        for _, html in SiteMember._iter_pages(site, [group]):
+            page_members = SiteMember._parse(site, html, users)
+            members.extend(page_members)
+            yield from page_members
+
+        # 最後まで走査した場合のみキャッシュする
+        SiteMember._set_cached(site, group, members)
+
+    @staticmethod
+    def _validate_groups(groups: list[str]) -> None:
+        for group in groups:
+            if group not in _VALID_GROUPS:
+                raise ValueError("Invalid group")
+
+    @staticmethod
+    def get_groups(
+        site: "Site", groups: list[str], refresh: bool = False
+    ) -> dict[str, list["SiteMember"]]:
+        """複数のグループのメンバーをまとめて取得する
+
+        キャッシュにないグループは同時にリクエストされる
+
+        Parameters
+        ----------
+        site: Site
+            サイト
+        groups: list[str]
+            グループのリスト (各要素は "admins", "moderators", "" のいずれか)
+        refresh: bool
+            キャッシュを使わずに再取得するかどうか
+
+        Returns
+        -------
+        dict[str, list[SiteMember]]
+            グループ -> メンバーのリスト
+        """
+        SiteMember._validate_groups(groups)
+
+        result: dict[str, list["SiteMember"]] = {}
+        targets: list[str] = []
+        for group in groups:
+            cached = None if refresh else SiteMember._get_cached(site, group)
+            if cached is not None:
+                result[group] = cached
+            elif group not in targets:
+                targets.append(group)
+
+        if len(targets) > 0:
+            acquired = SiteMember._acquire(site, targets)
+            for group, members in acquired.items():
+                SiteMember._set_cached(site, group, members)
+                result[group] = members
+
+        return result
+
+    @staticmethod
+    def _acquire(site: "Site", groups: list[str]) -> dict[str, list["SiteMember"]]:
+        """グループごとのメンバーをAMCリクエストで取得する"""
+        members: dict[str, list["SiteMember"]] = {group: [] for group in groups}
+        # グループ・ページをまたいで同じユーザーの解析結果を共有する
+        users: dict[str, "AbstractUser"] = {}
+
+        for group, html in SiteMember._iter_pages(site, groups):
+            members[group].extend(SiteMember._parse(site, html, users))
+
+        return members
+
+    @staticmethod
+    def _iter_pages(
+        site: "Site", groups: list[str]
+    ) -> Iterator[tuple[str, lxml_html.HtmlElement]]:
+        """グループごとのメンバー一覧のページを (グループ, HTML) として順に返す
+
+        全グループの先頭ページを同時に取得し、残りのページも全グループ分を同時に取得する
+        全メンバー ("") は1ページ目と同時にMEMBERS_PREFETCH_PAGESページ目までを先読みする
+        HTMLの解析は呼び出し元が次のページを要求したときに行う
+        """
+        # 最初に取得する (グループ, ページ番号) のリスト
+        first_pages = [
+            (group, page)
+            for group in groups
+            for page in range(1, (MEMBERS_PREFETCH_PAGES if group == "" else 1) + 1)
+        ]
+        first_responses = site.amc_request(
             [
                 {
                     "moduleName": "membership/MembersListModule",
-                    "page": 1,
+                    "page": page,
                     "group": group,
                 }
+                for group, page in first_pages
             ]
-        )[0]
+        )
 
-        first_body = first_response.json()["body"]
-        first_html = BeautifulSoup(first_body, "lxml")
+        # グループ -> ページ番号 -> レスポンスのHTML文字列
+        prefetched: dict[str, dict[int, str]] = {group: {} for group in groups}
+        for (group, page), response in zip(first_pages, first_responses):
+            prefetched[group][page] = response.json()["body"]
 
-        members.extend(SiteMember._parse(site, first_html))
+        # 先読みしていない (グループ, ページ番号) のリスト
+        remaining_pages: list[tuple[str, int]] = []
+        for group in groups:
+            first_html = lxml_html.fromstring(prefetched[group][1])
+            yield group, first_html
 
-        pager = first_html.select_one("div.pager")
-        if pager is None:
-            return members
+            # pagerのリンクの最後から2番目が最終ページ
+            pager_links = _find_all(_PAGER_LINKS_XPATH, first_html)
+            if len(pager_links) < 2:
+                continue
 
-        last_page = int(pager.select("a")[-2].text)
-        if last_page == 1:
-            return members
+            last_page = int(pager_links[-2].text_content())
+            for page in range(2, last_page + 1):
+                # 先読み済みのページはそのまま使い、残りをまとめてリクエストする
+                if page in prefetched[group]:
+                    yield group, lxml_html.fromstring(prefetched[group][page])
+                else:
+                    remaining_pages.append((group, page))
+
+        if len(remaining_pages) == 0:
+            return
 
         responses = site.amc_request(
             [
@@ -85,13 +352,9 @@ class SiteMember:
                     "page": page,
                     "group": group,
                 }
-                for page in range(2, last_page + 1)
+                for group, page in remaining_pages
             ]
         )
 
-        for response in responses:
-            body = response.json()["body"]
-            html = BeautifulSoup(body, "lxml")
-            members.extend(SiteMember._parse(site, html))
-
-        return members
+        for (group, _), response in zip(remaining_pages, responses):
+            yield group, lxml_html.fromstring(response.json()["body"])
@@ -7,10 +7,22 @@ from bs4 import BeautifulSoup
 from ..common.exceptions import NoElementException, NotFoundException
 from ..util.requestutil import RequestUtil
 from ..util.stringutil import StringUtil
+from ..util.ttl_cache import TTLCache
 
 if TYPE_CHECKING:
     from .client import Client
 
+# UserCollection.from_namesで取得したユーザー情報を保持する秒数と件数
+USER_INFO_CACHE_TTL = 3600
+USER_INFO_CACHE_SIZE = 4096
+
+# UserCollection.from_namesで取得したユーザー情報のキャッシュ
+# ユーザー情報はクライアントによらないため、全クライアントで共有する
+# UNIX名 -> (ユーザーID, ユーザー名)
+_user_info_cache: TTLCache[str, tuple[int, str]] = TTLCache(
+    USER_INFO_CACHE_SIZE, USER_INFO_CACHE_TTL
+)
+
 
 class UserCollection(list["AbstractUser"]):
     """ユーザーオブジェクトのリスト"""
@@ -24,6 +36,8 @@ class UserCollection(list["AbstractUser"]):
     ) -> "UserCollection":
         """ユーザー名のリストからユーザーオブジェクトのリストを取得する
 
+        取得したユーザーIDとユーザー名はUSER_INFO_CACHE_TTL秒の間キャッシュされ、同じユーザー名に対する呼び出しで再利用される
+
         Parameters
         ----------
         client: Client
@@ -39,18 +53,32 @@ class UserCollection(list["AbstractUser"]):
         UserCollection
             ユーザーオブジェクトのリスト
         """
-        responses = RequestUtil.request(
-            client,
-            "GET",
-            [
-                f"https://www.wikidot.com/user:info/{StringUtil.to_unix(name)}"
-                for name in names
-            ],
+        unix_names = [StringUtil.to_unix(name) for name in names]
+
+        # キャッシュにないユーザーだけを取得する (重複は1回だけ取得する)
+        # UNIX名 -> (ユーザーID, ユーザー名) 見つからなかった場合はNone
+        infos: dict[str, tuple[int, str] | None] = {}
+        for unix_name in unix_names:
+            cached = _user_info_cache.get(unix_name)
+            if cached is not None:
+                infos[unix_name] = cached
+
+        targets = list(dict.fromkeys(n for n in unix_names if n not in infos))
+
+        responses = (
+            RequestUtil.request(
+                client,
+                "GET",
+                [
+                    f"https://www.wikidot.com/user:info/{unix_name}"
+                    for unix_name in targets
+                ],
+            )
+            if len(targets) > 0
+            else []
         )
 
-        users: list[AbstractUser] = []
-
-        for response in responses:
+        for unix_name, response in zip(targets, responses):
             if isinstance(response, Exception):
                 raise response
 
@@ -58,10 +86,8 @@ class UserCollection(list["AbstractUser"]):
 
             # 存在チェック
             if html.select_one("div.error-block"):
-                if raise_when_not_found:
-                    raise NotFoundException(f"User not found: {response.url}")
-                else:
-                    continue
+                infos[unix_name] = None
+                continue
 
             # id取得
             user_id_elem = html.select_one("a.btn.btn-default.btn-xs")
@@ -75,6 +101,23 @@ class UserCollection(list["AbstractUser"]):
                 raise NoElementException("User name element not found")
             name = name_elem.get_text(strip=True)
 
+            infos[unix_name] = (user_id, name)
+            _user_info_cache.set(unix_name, (user_id, name))
+
+        users: list[AbstractUser] = []
+
+        for unix_name in unix_names:
+            info = infos[unix_name]
+            if info is None:
+                if raise_when_not_found:
+                    raise NotFoundException(
+                        f"User not found: https://www.wikidot.com/user:info/{unix_name}"
+                    )
+                else:
+                    continue
+
+            user_id, name = info
+
             # avatar_url取得
             avatar_url = f"https://www.wikidot.com/avatar.php?userid={user_id}"
 
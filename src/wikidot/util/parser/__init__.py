@@ -1,2 +1,4 @@
 from .odate import odate_parse as odate
+from .odate import odate_parse_lxml as odate_lxml
 from .user import user_parse as user
+from .user import user_parse_lxml as user_lxml
@@ -1,6 +1,11 @@
+import re
 from datetime import datetime
 
 import bs4
+from lxml import html as lxml_html
+
+# odate要素のclassに含まれるunix time (例: time_1234567890)
+_ODATE_TIME_CLASS_RE = re.compile(r"time_(\d+)")
 
 
 def odate_parse(odate_element: bs4.Tag) -> datetime:
@@ -24,8 +29,37 @@ def odate_parse(odate_element: bs4.Tag) -> datetime:
     """
     _odate_classes = odate_element["class"]
     for _odate_class in _odate_classes:
-        if "time_" in str(_odate_class):
-            unix_time = int(str(_odate_class).replace("time_", ""))
-            return datetime.fromtimestamp(unix_time)
+        time_match = _ODATE_TIME_CLASS_RE.fullmatch(str(_odate_class))
+        if time_match is not None:
+            return datetime.fromtimestamp(int(time_match.group(1)))
+
+    raise ValueError("odate element does not contain a valid unix time")
+
+
+def odate_parse_lxml(odate_element: lxml_html.HtmlElement) -> datetime:
+    """odate要素(lxml)を解析し、datetimeオブジェクトを返す
+
+    odate_parseのlxml版
+
+    Parameters
+    ----------
+    odate_element: lxml.html.HtmlElement
+        odate要素
+
+    Returns
+    -------
+    datetime
+        odate要素が表す日時
+
+    Raises
+    ------
+    ValueError
+        odate要素が有効なunix timeを含んでいない場合
+
+    """
+    for _odate_class in odate_element.get("class", "").split():
+        time_match = _ODATE_TIME_CLASS_RE.fullmatch(_odate_class)
+        if time_match is not None:
+            return datetime.fromtimestamp(int(time_match.group(1)))
 
     raise ValueError("odate element does not contain a valid unix time")
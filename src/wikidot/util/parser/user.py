@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
 import bs4
+from lxml import html as lxml_html
 
 from ...module import user
 
@@ -73,3 +74,68 @@ def user_parse(client: "Client", elem: bs4.Tag) -> user.AbstractUser:
         unix_name=user_unix,
         avatar_url=f"http://www.wikidot.com/avatar.php?userid={user_id}",
     )
+
+
+def user_parse_lxml(client: "Client", elem: lxml_html.HtmlElement) -> user.AbstractUser:
+    """printuser要素(lxml)をパースし、ユーザーオブジェクトを返す
+
+    user_parseのlxml版
+    BeautifulSoupを介さずにlxmlで解析したHTMLから直接ユーザーを取り出すために使う
+
+    Parameters
+    ----------
+    client: Client
+        クライアント
+    elem: lxml.html.HtmlElement
+        パース対象の要素（printuserクラスがついた要素）
+
+    Returns
+    -------
+    user.AbstractUser
+        パースされて得られたユーザーオブジェクト
+        User | DeletedUser | AnonymousUser | GuestUser | WikidotUser のいずれか
+    """
+    classes = elem.get("class", "").split()
+
+    if "deleted" in classes:
+        return user.DeletedUser(client=client, id=int(elem.get("data-id")))
+
+    if "anonymous" in classes:
+        ip_elems = elem.xpath(
+            ".//span[contains(concat(' ', normalize-space(@class), ' '), ' ip ')]"
+        )
+        if len(ip_elems) == 0:
+            return user.AnonymousUser(client=client)
+        ip = ip_elems[0].text_content().replace("(", "").replace(")", "").strip()
+        return user.AnonymousUser(client=client, ip=ip)
+
+    # Gravatar URLを持つ場合はGuestUserとする
+    img_elem = elem.find(".//img")
+    if img_elem is not None and "gravatar.com" in img_elem.get("src", ""):
+        avatar_url = img_elem.get("src")
+        guest_name = elem.text_content().strip().split(" ")[0]
+        return user.GuestUser(
+            client=client,
+            name=guest_name,
+            avatar_url=avatar_url if avatar_url else None,
+        )
+
+    if elem.text_content() == "Wikidot":
+        return user.WikidotUser(client=client)
+
+    _user = elem.findall(".//a")[-1]
+    user_name = _user.text_content()
+    user_unix = _user.get("href", "").replace("http://www.wikidot.com/user:info/", "")
+    user_id = int(
+        _user.get("onclick", "")
+        .replace("WIKIDOT.page.listeners.userInfo(", "")
+        .replace("); return false;", "")
+    )
+
+    return user.User(
+        client=client,
+        id=user_id,
+        name=user_name,
+        unix_name=user_unix,
+        avatar_url=f"http://www.wikidot.com/avatar.php?userid={user_id}",
+    )
@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """有効期限と件数の上限を持つキャッシュ
+
+    有効期限が切れたエントリは参照時に破棄する
+    件数がmaxsizeを超えたら最も長く使われていないものから破棄する
+    Noneは「キャッシュにない」ことを表すため、値として保存できない
+
+    Parameters
+    ----------
+    maxsize: int
+        保持する最大件数
+    ttl: float
+        エントリを保持する秒数
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # キー -> (保存時刻, 値) (最も長く使われていないものから順に並ぶ)
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """有効な値を返す キャッシュにない場合や期限切れの場合はNoneを返す
+
+        Parameters
+        ----------
+        key: K
+            キー
+
+        Returns
+        -------
+        V | None
+            値
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        """値を保存する
+
+        Parameters
+        ----------
+        key: K
+            キー
+        value: V
+            値
+        """
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: K) -> None:
+        """キーがあれば破棄する
+
+        Parameters
+        ----------
+        key: K
+            キー
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """全てのエントリを破棄する"""
+        self._entries.clear()